@@ -1,15 +1,42 @@
 import asyncio
 import hashlib
 import json
+import random
 import time
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 
 import aiohttp
+import orjson
+from multidict import CIMultiDict, CIMultiDictProxy
 
 from utils.logger import get_logger
 from utils.settings import get_settings
 
+_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36"
+
+# CCXT side/type -> MEXC codes (close sides mirror create_order_ccxt's close_position flag)
+_SIDE_OPEN = {"buy": 1, "sell": 2}
+_SIDE_CLOSE = {"buy": 4, "sell": 3}
+_TYPE_MAP = {"limit": "1", "market": "2"}
+_SIDE_TO_CCXT = {1: "buy", 2: "sell", 3: "sell", 4: "buy"}
+_TYPE_TO_CCXT = {v: k for k, v in _TYPE_MAP.items()}
+
+# Max bytes of a non-JSON/error response body kept in logs and error results
+_ERROR_BODY_LIMIT = 2048
+
+# Retries on transient failures: GETs are idempotent, order creation is not
+_DEFAULT_RETRIES = {"GET": 3, "POST": 0}
+
+
+class _TransientError(Exception):
+    """Retryable HTTP status (429 or 5xx)."""
+
+    def __init__(self, status: int, text: str):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.text = text
+
 
 class MEXCExchange:
     """
@@ -17,13 +44,14 @@ class MEXCExchange:
     Supports creating, modifying, canceling orders and fetching market data.
     """
 
-    def __init__(self, api_key: str = None, logger=None):
+    def __init__(self, api_key: str = None, logger=None, max_concurrency: int = 10):
         """
         Initialize MEXC exchange.
 
         Args:
             api_key: MEXC API key
             logger: Logger instance
+            max_concurrency: Max in-flight requests for batch helpers
         """
         self.api_key = api_key or get_settings().mexc_id
         self.logger = logger or get_logger()
@@ -32,28 +60,64 @@ class MEXCExchange:
         self.base_url = "https://futures.mexc.com/api/v1"
         self.contract_url = "https://contract.mexc.com/api/v1"
 
-        # Headers for authenticated requests
-        self.headers = {
-            "Content-Type": "application/json",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36",
-        }
+        # Headers for authenticated requests (built once, read-only)
+        headers = CIMultiDict(
+            [("Content-Type", "application/json"), ("User-Agent", _USER_AGENT)]
+        )
 
         if self.api_key:
-            self.headers["Authorization"] = self.api_key
+            headers["Authorization"] = self.api_key
+
+        self.headers = CIMultiDictProxy(headers)
+
+        # API key is constant, so its MD5 prefix state is hashed once and copied per signature
+        self._api_key_md5 = hashlib.md5((self.api_key or "").encode("utf-8"))
 
         # Session management
         self._session = None
+        self._connect_lock = asyncio.Lock()
+        self._batch_semaphore = asyncio.Semaphore(max_concurrency)
         self._timeout = aiohttp.ClientTimeout(total=30, connect=10)
 
-    async def _get_session(self):
-        """Get or create aiohttp session."""
+        # Cached whole-second ISO prefix for order book timestamps
+        self._iso_second = None
+        self._iso_prefix = ""
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def connect(self):
+        """Create aiohttp session once, guarded against concurrent callers."""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(timeout=self._timeout)
+            async with self._connect_lock:
+                if self._session is None or self._session.closed:
+                    # One pool shared by futures.mexc.com and contract.mexc.com;
+                    # aiohttp keys keep-alive connections per host.
+                    connector = aiohttp.TCPConnector(
+                        limit=200,
+                        limit_per_host=64,
+                        use_dns_cache=True,
+                        ttl_dns_cache=300,
+                        keepalive_timeout=75,
+                    )
+                    self._session = aiohttp.ClientSession(
+                        timeout=self._timeout, connector=connector
+                    )
         return self._session
 
-    def _md5_hash(self, value: str) -> str:
-        """Generate MD5 hash of input string."""
-        return hashlib.md5(value.encode("utf-8")).hexdigest()
+    def _iso_timestamp(self, ts_ms: int) -> str:
+        """Format millisecond timestamp as UTC ISO string, re-formatting only on second change."""
+        second, ms = divmod(ts_ms, 1000)
+        if second != self._iso_second:
+            self._iso_second = second
+            self._iso_prefix = datetime.fromtimestamp(second, tz=timezone.utc).strftime(
+                "%Y-%m-%dT%H:%M:%S"
+            )
+        return f"{self._iso_prefix}.{ms:03d}+00:00"
 
     def _generate_signature(self, obj: Dict = None) -> Dict[str, str]:
         """
@@ -68,77 +132,108 @@ class MEXCExchange:
         if not self.api_key:
             raise ValueError("API key is required for authenticated requests")
 
-        date_now = str(int(time.time() * 1000))
-        g = self._md5_hash(self.api_key + date_now)[7:]
+        date_now = str(time.time_ns() // 1_000_000)
+        # md5(api_key + date_now): resume from the precomputed api_key state
+        key_hash = self._api_key_md5.copy()
+        key_hash.update(date_now.encode("utf-8"))
+        g = key_hash.hexdigest()[7:]
         s = json.dumps(obj or {}, separators=(",", ":"))
-        sign = self._md5_hash(date_now + s + g)
+        sign = hashlib.md5((date_now + s + g).encode("utf-8")).hexdigest()
         return {"time": date_now, "sign": sign}
 
     async def _make_request(
-        self, method: str, url: str, data: Dict = None, authenticated: bool = False
+        self,
+        method: str,
+        url: str,
+        data: Dict = None,
+        authenticated: bool = False,
+        retries: Optional[int] = None,
     ) -> Dict:
         """
         Make HTTP request to MEXC API.
 
+        Transient failures (timeouts, client errors, 429 and 5xx) are retried with
+        exponential backoff and jitter.
+
         Args:
             method: HTTP method (GET, POST, etc.)
             url: Full URL
             data: Request data
             authenticated: Whether to include authentication headers
+            retries: Extra attempts on transient failure (default: 3 for GET, 0 for POST)
 
         Returns:
             Response data as dict
         """
-        headers = self.headers.copy()
+        method = method.upper()
+        if retries is None:
+            retries = _DEFAULT_RETRIES.get(method, 0)
+
+        # Lazy connect for callers that don't use the async context manager
+        session = self._session
+        if session is None:
+            session = await self.connect()
+
+        for attempt in range(retries + 1):
+            try:
+                return await self._send(session, method, url, data, authenticated)
+            except (asyncio.TimeoutError, aiohttp.ClientError, _TransientError) as e:
+                if attempt < retries:
+                    delay = min(0.1 * (2**attempt), 2.0) + random.random() * 0.1
+                    self.logger.warning(
+                        f"Transient error for {url} ({e!r}), retry {attempt + 1}/{retries} in {delay:.2f}s"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                if isinstance(e, asyncio.TimeoutError):
+                    self.logger.error(f"Request timeout for {url}")
+                    return {"error": "Request timeout"}
+                if isinstance(e, _TransientError):
+                    self.logger.error(f"HTTP error {e.status}: {e.text}")
+                    return {"error": f"HTTP {e.status}", "data": e.text}
+                self.logger.error(f"Client error: {e}")
+                return {"error": f"Client error: {str(e)}"}
+            except Exception as e:
+                self.logger.error(f"Request failed: {e}")
+                return {"error": str(e)}
+
+    async def _send(
+        self, session, method: str, url: str, data: Dict, authenticated: bool
+    ) -> Dict:
+        """Send a single request; raise _TransientError on 429/5xx."""
+        if method not in ("GET", "POST"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        headers = self.headers
 
+        # Signed per attempt so retries carry a fresh nonce
         if authenticated and self.api_key:
+            headers = CIMultiDict(self.headers)
             signature = self._generate_signature(data)
             headers["x-mxc-sign"] = signature["sign"]
             headers["x-mxc-nonce"] = signature["time"]
 
-        # Get or create session
-        session = await self._get_session()
-        try:
-            if method.upper() == "GET":
-                async with session.get(url, headers=headers) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        self.logger.error(f"HTTP error {response.status}: {error_text}")
-                        return {"error": f"HTTP {response.status}", "data": error_text}
-
-                    try:
-                        result = await response.json()
-                    except aiohttp.ContentTypeError:
-                        error_text = await response.text()
-                        self.logger.error(f"Invalid JSON response: {error_text}")
-                        return {"error": "Invalid JSON response", "data": error_text}
-            elif method.upper() == "POST":
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        self.logger.error(f"HTTP error {response.status}: {error_text}")
-                        return {"error": f"HTTP {response.status}", "data": error_text}
-
-                    try:
-                        result = await response.json()
-                    except aiohttp.ContentTypeError:
-                        error_text = await response.text()
-                        self.logger.error(f"Invalid JSON response: {error_text}")
-                        return {"error": "Invalid JSON response", "data": error_text}
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+        async with session.request(
+            method, url, headers=headers, json=data if method == "POST" else None
+        ) as response:
+            body = await response.read()
 
-            return result
+        if response.status == 429 or response.status >= 500:
+            raise _TransientError(
+                response.status, body[:_ERROR_BODY_LIMIT].decode("utf-8", "replace")
+            )
 
-        except asyncio.TimeoutError:
-            self.logger.error(f"Request timeout for {url}")
-            return {"error": "Request timeout"}
-        except aiohttp.ClientError as e:
-            self.logger.error(f"Client error: {e}")
-            return {"error": f"Client error: {str(e)}"}
-        except Exception as e:
-            self.logger.error(f"Request failed: {e}")
-            return {"error": str(e)}
+        if response.status != 200:
+            error_text = body[:_ERROR_BODY_LIMIT].decode("utf-8", "replace")
+            self.logger.error(f"HTTP error {response.status}: {error_text}")
+            return {"error": f"HTTP {response.status}", "data": error_text}
+
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            error_text = body[:_ERROR_BODY_LIMIT].decode("utf-8", "replace")
+            self.logger.error(f"Invalid JSON response: {error_text}")
+            return {"error": "Invalid JSON response", "data": error_text}
 
     async def get_futures_price(self, symbol: str) -> Optional[float]:
         """
@@ -321,7 +416,63 @@ class MEXCExchange:
 
         obj = {"orderId": order_id, "symbol": symbol}
         url = f"{self.base_url}/private/order/cancel"
-        return await self._make_request("POST", url, obj, authenticated=True)
+        # Cancelling twice is harmless, so allow one retry
+        return await self._make_request("POST", url, obj, authenticated=True, retries=1)
+
+    async def _limited(self, coro):
+        """Await coroutine under the batch concurrency limit."""
+        async with self._batch_semaphore:
+            return await coro
+
+    async def cancel_orders(self, items: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Cancel several orders concurrently.
+
+        Args:
+            items: List of (order_id, symbol) pairs
+
+        Returns:
+            Cancel results (or exceptions) in input order
+        """
+        return await asyncio.gather(
+            *(
+                self._limited(self.cancel_order(order_id, symbol))
+                for order_id, symbol in items
+            ),
+            return_exceptions=True,
+        )
+
+    async def chase_orders(self, order_ids: List[str]) -> List[Dict]:
+        """
+        Chase several orders concurrently.
+
+        Args:
+            order_ids: Order IDs to chase
+
+        Returns:
+            Chase results (or exceptions) in input order
+        """
+        return await asyncio.gather(
+            *(self._limited(self.chase_order(order_id)) for order_id in order_ids),
+            return_exceptions=True,
+        )
+
+    async def get_open_orders_and_positions(
+        self, page_size: int = 200
+    ) -> Tuple[Dict, Dict]:
+        """
+        Fetch open orders and open positions concurrently.
+
+        Args:
+            page_size: Number of orders to fetch
+
+        Returns:
+            (open orders data, open positions data)
+        """
+        orders, positions = await asyncio.gather(
+            self.get_open_orders(page_size), self.get_open_positions()
+        )
+        return orders, positions
 
     async def get_order_book(self, symbol: str) -> Dict:
         """
@@ -382,12 +533,13 @@ class MEXCExchange:
             asks = [[float(ask[0]), float(ask[1])] for ask in data.get("asks", [])]
             bids = [[float(bid[0]), float(bid[1])] for bid in data.get("bids", [])]
 
+            timestamp = time.time_ns() // 1_000_000
             return {
                 "symbol": symbol,
                 "asks": asks,
                 "bids": bids,
-                "timestamp": int(time.time() * 1000),
-                "datetime": datetime.utcnow().isoformat(),
+                "timestamp": timestamp,
+                "datetime": self._iso_timestamp(timestamp),
             }
 
         except Exception as e:
@@ -419,15 +571,14 @@ class MEXCExchange:
         """
         try:
             # Convert CCXT parameters to MEXC format
-            mexc_side = 1 if side == "buy" else 2  # Default to open long/short
-            mexc_order_type = "1" if order_type == "limit" else "2"
+            # Unknown side/order_type raise KeyError here, before any request is sent
+            mexc_side = (
+                _SIDE_CLOSE if kwargs.get("close_position", False) else _SIDE_OPEN
+            )[side]
+            mexc_order_type = _TYPE_MAP[order_type]
             open_type = kwargs.get("openType", 1)  # 1=isolated, 2=cross
             leverage = kwargs.get("leverage", 20)
 
-            # Handle position closing
-            if kwargs.get("close_position", False):
-                mexc_side = 4 if side == "buy" else 3  # Close long/short
-
             # Convert USDT amount to contract volume
             if price is None and order_type == "market":
                 # For market orders, get current price
@@ -516,10 +667,10 @@ class MEXCExchange:
                 {
                     "id": order.get("orderId"),
                     "symbol": order.get("symbol"),
-                    "side": "buy" if order.get("side") in [1, 3] else "sell",
+                    "side": _SIDE_TO_CCXT.get(order.get("side"), "sell"),
                     "amount": order.get("vol"),
                     "price": order.get("price"),
-                    "type": "limit" if order.get("type") == "1" else "market",
+                    "type": _TYPE_TO_CCXT.get(str(order.get("type")), "market"),
                     "status": "open",
                     "filled": order.get("filled", 0),
                     "remaining": order.get("remaining", order.get("vol")),
@@ -543,51 +694,48 @@ class MEXCExchange:
 
 async def test_class_mexc_exchange():
     """Simple test for MEXC exchange operations."""
-    mexc = MEXCExchange()
-
-    # Get price
-    price = await mexc.get_futures_price("BTC_USDT")
-    print(f"BTC price: {price}")
-
-    # Test volume computation
-    usdt_amount = 100  # 100 USDT
-    vol = await mexc.compute_volume("BTC_USDT", usdt_amount, price, 20)
-    print(f"Volume for {usdt_amount} USDT at {price}: {vol}")
-
-    # Create limit order using CCXT method (USDT amount)
-    order = await mexc.create_order_ccxt(
-        symbol="BTC_USDT",
-        side="buy",  # Open long
-        amount=20,  # 20 USDT
-        price=price * 0.8,  # Half current price
-        order_type="limit",
-        leverage=5,
-    )
-    print(f"CCXT Order: {order}")
-
-    # Create market order using CCXT method (USDT amount)
-    market_order = await mexc.create_order_ccxt(
-        symbol="BTC_USDT",
-        side="sell",  # Open short
-        amount=25,  # 25 USDT
-        order_type="market",
-        leverage=20,
-    )
-    print(f"CCXT Market order: {market_order}")
-
-    # Close long using CCXT method
-    close_order = await mexc.create_order_ccxt(
-        symbol="BTC_USDT",
-        side="sell",  # Close long
-        amount=50,  # 50 USDT
-        price=price * 1.001,
-        order_type="limit",
-        leverage=20,
-        close_position=True,
-    )
-    print(f"CCXT Close order: {close_order}")
-
-    await mexc.close()
+    async with MEXCExchange() as mexc:
+        # Get price
+        price = await mexc.get_futures_price("BTC_USDT")
+        print(f"BTC price: {price}")
+
+        # Test volume computation
+        usdt_amount = 100  # 100 USDT
+        vol = await mexc.compute_volume("BTC_USDT", usdt_amount, price, 20)
+        print(f"Volume for {usdt_amount} USDT at {price}: {vol}")
+
+        # Create limit order using CCXT method (USDT amount)
+        order = await mexc.create_order_ccxt(
+            symbol="BTC_USDT",
+            side="buy",  # Open long
+            amount=20,  # 20 USDT
+            price=price * 0.8,  # Half current price
+            order_type="limit",
+            leverage=5,
+        )
+        print(f"CCXT Order: {order}")
+
+        # Create market order using CCXT method (USDT amount)
+        market_order = await mexc.create_order_ccxt(
+            symbol="BTC_USDT",
+            side="sell",  # Open short
+            amount=25,  # 25 USDT
+            order_type="market",
+            leverage=20,
+        )
+        print(f"CCXT Market order: {market_order}")
+
+        # Close long using CCXT method
+        close_order = await mexc.create_order_ccxt(
+            symbol="BTC_USDT",
+            side="sell",  # Close long
+            amount=50,  # 50 USDT
+            price=price * 1.001,
+            order_type="limit",
+            leverage=20,
+            close_position=True,
+        )
+        print(f"CCXT Close order: {close_order}")
 
 
 if __name__ == "__main__":
@@ -1,11 +1,276 @@
 import asyncio
-import json
-import statistics
+import heapq
+import os
 import time
-import traceback
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+import orjson
+
+try:
+    from numba import njit
+except ImportError:  # numba has no wheels for some platforms/Python versions: run the kernels as plain Python
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+class Window(NamedTuple):
+    """Time-ordered array views of one symbol's ticks."""
+
+    ts: np.ndarray
+    price: np.ndarray
+    ask: np.ndarray
+    bid: np.ndarray
+    vol: np.ndarray
+    cum_vol: np.ndarray
+
+
+class SymbolBuffer:
+    """
+    Ring buffer of ticks for one (exchange, symbol), stored as parallel NumPy arrays.
+    Storage starts small and doubles as ticks arrive, up to max_capacity; from then
+    on the oldest tick is overwritten.
+    Every value is written at i and i + capacity, so the time-ordered window is
+    always a single contiguous slice. Volume is kept as a running total, so the
+    volume of any window is the difference of two entries.
+
+    Timestamps are kept non-decreasing (window lookups rely on it): a tick older
+    than the previous one is stored with the previous timestamp.
+    """
+
+    def __init__(self, capacity: int = 1024, max_capacity: int = 86400):
+        self.max_capacity = max_capacity
+        self.capacity = 0
+        self.head = 0
+        self.size = 0
+        self.total_vol = 0.0
+        self.last_ts = 0
+        self._allocate(min(capacity, max_capacity))
+
+    def _allocate(self, capacity: int):
+        """(Re)allocate storage for capacity ticks, keeping the stored ones in time order."""
+        stored = self.window(0) if self.size else ()
+        self.ts = np.empty(2 * capacity, dtype=np.int64)
+        # Quotes and sizes in float32 (output is rounded to 4 decimals), as rows of one block;
+        # running volume total stays float64
+        self.price, self.ask, self.bid, self.vol = np.empty((4, 2 * capacity), dtype=np.float32)
+        self.cum_vol = np.empty(2 * capacity, dtype=np.float64)
+        columns = (self.ts, self.price, self.ask, self.bid, self.vol, self.cum_vol)
+        for column, values in zip(columns, stored):
+            column[: self.size] = column[capacity : capacity + self.size] = values
+        self.capacity = capacity
+        self.head = self.size % capacity
+
+    def _reserve(self, count: int):
+        """Grow geometrically (up to max_capacity) so that count more ticks fit without overwriting."""
+        capacity = self.capacity
+        while capacity < self.size + count and capacity < self.max_capacity:
+            capacity *= 2
+        if capacity != self.capacity:
+            self._allocate(min(capacity, self.max_capacity))
+
+    def append(self, ts: int, price: float, ask: float, bid: float, vol: float):
+        """Store one tick, overwriting the oldest once max_capacity is reached."""
+        if self.size == self.capacity:
+            self._reserve(1)
+        if ts < self.last_ts:
+            ts = self.last_ts
+        self.last_ts = ts
+        self.total_vol += vol
+        for i in (self.head, self.head + self.capacity):
+            self.ts[i] = ts
+            self.price[i] = price
+            self.ask[i] = ask
+            self.bid[i] = bid
+            self.vol[i] = vol
+            self.cum_vol[i] = self.total_vol
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, ts, price, ask, bid, vol):
+        """Store a batch of ticks (NumPy arrays) in arrival order."""
+        n = len(price)
+        if not n:
+            return
+        self._reserve(n)
+        ts = np.maximum.accumulate(np.maximum(ts, self.last_ts))
+        self.last_ts = int(ts[-1])
+        cum_vol = self.total_vol + np.cumsum(vol)
+        self.total_vol = float(cum_vol[-1])
+
+        # Only the newest `capacity` ticks survive the wrap, so write just those
+        keep = slice(max(n - self.capacity, 0), n)
+        idx = (self.head + np.arange(n)[keep]) % self.capacity
+        columns = (self.ts, self.price, self.ask, self.bid, self.vol, self.cum_vol)
+        for column, values in zip(columns, (ts, price, ask, bid, vol, cum_vol)):
+            column[idx] = column[idx + self.capacity] = values[keep]
+        self.head = (self.head + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def window(self, cutoff_ts: int) -> Window:
+        """Return views of ticks with timestamp >= cutoff_ts."""
+        end = self.head if self.head >= self.size else self.head + self.capacity
+        start = end - self.size
+        start += int(np.searchsorted(self.ts[start:end], cutoff_ts, side="left"))
+        return Window(
+            self.ts[start:end],
+            self.price[start:end],
+            self.ask[start:end],
+            self.bid[start:end],
+            self.vol[start:end],
+            self.cum_vol[start:end],
+        )
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _compute_all_metrics(ts, price, ask, bid, vol, cum_vol, cutoffs, natr_period):
+    """
+    Compute (delta, vol, trade, NATR, spread, activity) over time-ordered tick arrays.
+    cutoffs holds the window start timestamp of each metric in the same order.
+    """
+    n = ts.size
+
+    # Delta: relative change between first and last price in window
+    start = np.searchsorted(ts, cutoffs[0])
+    delta = 0.0
+    if n - start == 1:
+        delta = 0.0001  # single point, return minimum value
+    elif n - start > 1 and price[start] != 0:
+        delta = abs(np.float64(price[n - 1]) - price[start]) / price[start]
+
+    # Volume: difference of running totals, no scan over the window
+    volume = 0.0
+    start = np.searchsorted(ts, cutoffs[1])
+    if start < n:
+        volume = cum_vol[n - 1] - cum_vol[start] + vol[start]
+
+    # Trade count: each price update is one trade
+    trades = n - np.searchsorted(ts, cutoffs[2])
+
+    # NATR: mean true range of the last natr_period ticks (needs natr_period + 1 ticks in window);
+    # a tick is a single price, so its true range is the move from the previous one
+    natr = 0.0
+    if n - np.searchsorted(ts, cutoffs[3]) >= natr_period + 1 and price[n - 1] > 0:
+        tr_sum = 0.0
+        for i in range(n - natr_period, n):
+            tr_sum += abs(np.float64(price[i]) - price[i - 1])
+        natr = tr_sum / natr_period / price[n - 1]
+
+    # Spread of the latest tick
+    spread = 0.0
+    if n > np.searchsorted(ts, cutoffs[4]) and ask[n - 1] != 0 and bid[n - 1] != 0:
+        spread = (np.float64(ask[n - 1]) - bid[n - 1]) / ask[n - 1]
+
+    # Activity: updates per second; the mean interval telescopes to (last - first) / (count - 1)
+    activity = 0.0
+    start = np.searchsorted(ts, cutoffs[5])
+    if n - start >= 2 and ts[n - 1] > ts[start]:
+        activity = 1000.0 * (n - start - 1) / (ts[n - 1] - ts[start])
+
+    return delta, volume, trades, natr, spread, activity
+
+
+_TS_MIN, _TS_MAX = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _compute_buffer_metrics(ts, price, ask, bid, vol, cum_vol, head, size, capacity, cutoffs, natr_period, out, bounds):
+    """
+    _compute_all_metrics over the stored ticks of a SymbolBuffer (given its raw columns and
+    ring state), written to out. bounds[:, m] gets the timestamps (lo, hi] within which
+    cutoffs[m] can move without changing the window of metric m.
+    """
+    end = head if head >= size else head + capacity
+    start = end - size
+    stored = ts[start:end]
+    out[0], out[1], out[2], out[3], out[4], out[5] = _compute_all_metrics(
+        stored,
+        price[start:end],
+        ask[start:end],
+        bid[start:end],
+        vol[start:end],
+        cum_vol[start:end],
+        cutoffs,
+        natr_period,
+    )
+    first = np.searchsorted(stored, cutoffs)
+    for m in range(cutoffs.size):
+        bounds[0, m] = stored[first[m] - 1] if first[m] > 0 else _TS_MIN
+        bounds[1, m] = stored[first[m]] if first[m] < size else _TS_MAX
+
+
+def _buffer_metrics(buffer: SymbolBuffer, cutoffs: np.ndarray, out: np.ndarray, bounds: np.ndarray):
+    """Calculate all metrics for one tick buffer into out, in METRIC_NAMES order (see _compute_buffer_metrics)."""
+    b = buffer
+    _compute_buffer_metrics(
+        b.ts,
+        b.price,
+        b.ask,
+        b.bid,
+        b.vol,
+        b.cum_vol,
+        b.head,
+        b.size,
+        b.capacity,
+        cutoffs,
+        14,
+        out,
+        bounds,
+    )
+
+
+# Compile (or load from the numba cache) at import, so the first analysis is not delayed
+_buffer_metrics(SymbolBuffer(32), np.zeros(6, dtype=np.int64), np.empty(6), np.empty((2, 6), dtype=np.int64))
+
+
+METRIC_NAMES = ("delta", "vol", "trade", "NATR", "spread", "activity")
+_NATR = METRIC_NAMES.index("NATR")
+
+
+def _metrics_dict(values) -> Dict[str, Any]:
+    """Map one row of metric values to the output dict (trade count as int)."""
+    metrics = dict(zip(METRIC_NAMES, values))
+    metrics["trade"] = int(metrics["trade"])
+    return metrics
+
+
+def _unwrap_quote(value) -> Tuple[float, Optional[float]]:
+    """Split an ask/bid field ([price, size, ...] or bare price) into (price, size)."""
+    if type(value) is list:
+        if not value:
+            return 0, None
+        return value[0], value[1] if len(value) > 1 else None
+    if type(value) is float or type(value) is int:
+        return value, None
+    return 0, None
+
+
+def _tick_timestamp(value, default: int) -> int:
+    """Millisecond timestamp of a record, or default when it is missing or not a number (e.g. an ISO string)."""
+    if (type(value) is int or type(value) is float) and value > 0:
+        return int(value)
+    return default
+
+
+def _iter_jsonl(file_path: str, chunk_size: int = 10000) -> Iterator[List[Dict[str, Any]]]:
+    """Read JSON Lines file in chunks of parsed records, skipping blank and malformed lines."""
+    chunk = []
+    # Binary mode with a 1 MiB buffer: lines go to orjson as bytes, no text decoding
+    with open(file_path, "rb", buffering=1 << 20) as f:
+        for line in f:
+            if line.strip():
+                try:
+                    chunk.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    continue
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
 
 
 class TokensAnalyzer:
@@ -27,125 +292,63 @@ class TokensAnalyzer:
         self.test_mode = self.settings.tokens_test_mode
         self.save_to_file = self.settings.tokens_save_to_file or False
         self.symbols = self.settings.symbols
-        self.periods = self.settings.tokens_periods_seconds
+        self._symbol_map = {symbol: symbol.split("/", 1)[0].lower() for symbol in self.symbols}
+        self.periods = self.settings.tokens_periods
+        self.period_seconds = self.settings.tokens_periods_seconds
         self.thresholds = self.settings.tokens_thresholds
         self._data_processed = False
+        self._latest_timestamp = 0
+        self._timestamps_scanned = 0
+
+        # Single worker keeps result file writes ordered and off the event loop
+        self._io_executor = ThreadPoolExecutor(max_workers=1)
+
+        # Tick history: one buffer per (exchange, token), addressed by a small int id
+        self._buffer_ids: Dict[Tuple[str, str], int] = {}
+        self._buffer_keys: List[Tuple[str, str]] = []
+        self._buffers: List[SymbolBuffer] = []
+
+        # Cached metrics per buffer id and the buffers with new ticks since the last filter_and_save
+        self._metrics = np.zeros((0, len(METRIC_NAMES)))
+        self._metric_bounds = np.zeros((0, 2, len(METRIC_NAMES)), dtype=np.int64)
+        self._dirty: Set[int] = set()
+        self._last_result: Optional[Dict] = None
+        self._last_result_time = 0.0
+
+    def _buffer_id(self, exchange: str, symbol: str) -> int:
+        """Return id of the (exchange, token) buffer, registering it on first sight."""
+        key = (exchange, symbol)
+        buffer_id = self._buffer_ids.get(key)
+        if buffer_id is None:
+            buffer_id = self._buffer_ids[key] = len(self._buffers)
+            self._buffer_keys.append(key)
+            self._buffers.append(SymbolBuffer())
+        return buffer_id
+
+    def _latest_data_timestamp(self) -> int:
+        """Latest entry timestamp in the collection, scanning only entries added since the last call."""
+        collection = self.last_prices_collection
+        for i in range(self._timestamps_scanned, len(collection)):
+            entry = collection[i]
+            if isinstance(entry, dict) and "timestamp" in entry:
+                self._latest_timestamp = max(self._latest_timestamp, int(entry["timestamp"]))
+        self._timestamps_scanned = len(collection)
+        return self._latest_timestamp
 
     def _get_period_timestamp(self, period: str) -> int:
         """Get timestamp for given period."""
         # For testing with file data, use time from data
         if hasattr(self, "test_mode") and self.test_mode:
             # Find the latest timestamp from data
-            if self.last_prices_collection:
-                latest_timestamp = max(
-                    int(entry.get("timestamp", 0))
-                    for entry in self.last_prices_collection
-                    if isinstance(entry, dict) and "timestamp" in entry
-                )
-                period_seconds = self.periods.get(period, 3600)
+            latest_timestamp = self._latest_data_timestamp()
+            if latest_timestamp:
+                period_seconds = self.period_seconds.get(period, 3600)
                 return latest_timestamp - (period_seconds * 1000)
 
-        now = int(time.time() * 1000)
-        period_seconds = self.periods.get(period, 3600)  # default 1 hour
+        now = time.time_ns() // 1_000_000
+        period_seconds = self.period_seconds.get(period, 3600)  # default 1 hour
         return now - (period_seconds * 1000)
 
-    def _filter_by_period(self, data: deque, period: str) -> List:
-        """Filter data by period."""
-        cutoff_ts = self._get_period_timestamp(period)
-        return [item for item in data if item.get("timestamp", 0) >= cutoff_ts]
-
-    def _calculate_delta(self, prices: List[Dict]) -> float:
-        """Calculate absolute price difference (delta)."""
-        if len(prices) < 1:
-            return 0.0
-
-        if len(prices) == 1:
-            # If only one point, return minimum value
-            return 0.0001
-
-        # Take first and last price in period
-        first_price = float(prices[0].get("price", 0))
-        last_price = float(prices[-1].get("price", 0))
-
-        if first_price == 0:
-            return 0.0
-
-        return abs(last_price - first_price) / first_price
-
-    def _calculate_volume(self, volumes: List[Dict]) -> float:
-        """Calculate total trading volume."""
-        return sum(float(item.get("volume", 0)) for item in volumes)
-
-    def _calculate_trade_count(self, trades: List[Dict]) -> int:
-        """Calculate number of trades."""
-        return len(trades)
-
-    def _calculate_natr(self, prices: List[Dict], period: int = 14) -> float:
-        """Calculate Normalized Average True Range (NATR)."""
-        if len(prices) < period + 1:
-            return 0.0
-
-        # Sort by time
-        sorted_prices = sorted(prices, key=lambda x: x.get("timestamp", 0))
-
-        true_ranges = []
-        for i in range(1, len(sorted_prices)):
-            high = float(sorted_prices[i].get("high", sorted_prices[i].get("price", 0)))
-            low = float(sorted_prices[i].get("low", sorted_prices[i].get("price", 0)))
-            prev_close = float(sorted_prices[i - 1].get("price", 0))
-
-            tr1 = high - low
-            tr2 = abs(high - prev_close)
-            tr3 = abs(low - prev_close)
-
-            true_range = max(tr1, tr2, tr3)
-            true_ranges.append(true_range)
-
-        if not true_ranges:
-            return 0.0
-
-        atr = statistics.mean(true_ranges[-period:]) if len(true_ranges) >= period else statistics.mean(true_ranges)
-        current_price = float(sorted_prices[-1].get("price", 1))
-
-        return atr / current_price if current_price > 0 else 0.0
-
-    def _calculate_spread(self, prices: List[Dict]) -> float:
-        """Calculate spread (difference between ask and bid)."""
-        if not prices:
-            return 0.0
-
-        # Take latest data
-        last_data = prices[-1]
-        ask_val = last_data.get("ask")
-        ask = float(ask_val[0] if isinstance(ask_val, list) else ask_val if ask_val is not None else 0)
-        bid_val = last_data.get("bid")
-        bid = float(bid_val[0] if isinstance(bid_val, list) else bid_val if bid_val is not None else 0)
-
-        if ask == 0 or bid == 0:
-            return 0.0
-
-        return (ask - bid) / ask
-
-    def _calculate_activity(self, prices: List[Dict]) -> float:
-        """Calculate activity (price update frequency)."""
-        if len(prices) < 2:
-            return 0.0
-
-        # Sort by time
-        sorted_prices = sorted(prices, key=lambda x: x.get("timestamp", 0))
-
-        # Calculate average interval between updates
-        intervals = []
-        for i in range(1, len(sorted_prices)):
-            interval = sorted_prices[i].get("timestamp", 0) - sorted_prices[i - 1].get("timestamp", 0)
-            intervals.append(interval)
-
-        if not intervals:
-            return 0.0
-
-        avg_interval = statistics.mean(intervals) / 1000  # convert to seconds
-        return 1.0 / avg_interval if avg_interval > 0 else 0.0
-
     async def _analyze_file_data(self):
         """Analyze data from last_prices_ws.json file before switching to real data."""
         # Only read from file if save_to_file is True
@@ -153,26 +356,27 @@ class TokensAnalyzer:
             self.logger.info("File reading disabled (save_to_file=False). Skipping file analysis.")
             return
 
-        file_path = "data/last_prices_ws.json"
+        # Same file ExchangesWS writes (and preloads into the collection)
+        file_path = self.settings.exchanges_output_file
         try:
             self.logger.info(f"Loading data from {file_path}...")
-            with open(file_path) as f:
-                file_data = []
-                for line in f:
-                    if line.strip():
-                        try:
-                            entry = json.loads(line)
-                            file_data.append(entry)
-                        except json.JSONDecodeError:
-                            continue
-
-            if file_data:
-                self.logger.info(f"Loaded {len(file_data)} records from file")
-
-                # Process data from file
-                for entry in file_data:
-                    if isinstance(entry, dict):
-                        self._process_price_data(entry)
+            # Parse chunk by chunk in a worker thread so the event loop keeps serving websocket data
+            # and only one chunk of records is held in memory at a time
+            chunks = _iter_jsonl(file_path)
+            records = 0
+            while chunk := await asyncio.to_thread(next, chunks, None):
+                self._process_price_batch(chunk)
+                records += len(chunk)
+
+            # With save_to_file on, ExchangesWS preloads this file into the collection and appends every live
+            # tick to both, so the collection holds nothing the replay has not ingested. Otherwise the two are
+            # disjoint and filter_and_save ingests the whole collection as usual
+            if self.settings.save_to_file:
+                self._last_processed_length = len(self.last_prices_collection)
+                self._data_processed = True
+
+            if records:
+                self.logger.info(f"Loaded {records} records from file")
 
                 # Perform analysis with data from file
                 self.logger.info("Analyzing file data...")
@@ -201,29 +405,22 @@ class TokensAnalyzer:
         except Exception as e:
             self.logger.error(f"Error analyzing file data: {e}")
 
-    def _round_metrics(self, data: Dict) -> Dict:
-        """Round all numeric values in results to 4 decimal places."""
-        rounded_data: Dict[str, Any] = {}
-        for exchange, tokens in data.items():
-            rounded_data[exchange] = {}
-            for symbol, metrics in tokens.items():
-                rounded_data[exchange][symbol] = {}
-                for key, value in metrics.items():
-                    if isinstance(value, (int, float)):
-                        rounded_data[exchange][symbol][key] = round(value, 4)
-                    else:
-                        rounded_data[exchange][symbol][key] = value
-        return rounded_data
+    def _write_output(self, output_path: str, payload: bytes):
+        """Write serialized result to file (runs on the I/O worker thread)."""
+        try:
+            # Write aside and swap in, so concurrent readers (the web server) never see a partial file
+            tmp_path = output_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, output_path)
+            self.logger.info(f"Tokens analysis saved to {output_path}")
+        except Exception as e:
+            self.logger.error(f"Error saving tokens analysis: {e}")
 
     def _extract_symbol_from_data(self, entry: Dict) -> str:
         """Extract token symbol from data record."""
-        symbol = str(entry.get("symbol", ""))
-        # Check if this symbol is in our symbols list
-        if symbol in self.symbols:
-            if "/" in symbol:
-                return symbol.split("/")[0].lower()  # BTC from BTC/USDT
-            return symbol.lower()
-        return ""
+        # Configured symbols map to their token (BTC/USDT -> btc), anything else to ""
+        return self._symbol_map.get(str(entry.get("symbol", "")), "")
 
     def _process_price_data(self, entry: Dict):
         """Process price data and add to history."""
@@ -234,22 +431,8 @@ class TokensAnalyzer:
             return
 
         # Extract price (average of ask and bid)
-        ask = entry.get("ask")
-        bid = entry.get("bid")
-
-        if isinstance(ask, list) and len(ask) >= 1:
-            ask_price = ask[0]
-        elif isinstance(ask, (int, float)):
-            ask_price = ask
-        else:
-            ask_price = 0
-
-        if isinstance(bid, list) and len(bid) >= 1:
-            bid_price = bid[0]
-        elif isinstance(bid, (int, float)):
-            bid_price = bid
-        else:
-            bid_price = 0
+        ask_price, ask_size = _unwrap_quote(entry.get("ask"))
+        bid_price, bid_size = _unwrap_quote(entry.get("bid"))
 
         if ask_price > 0 and bid_price > 0:
             price = (ask_price + bid_price) / 2
@@ -260,52 +443,67 @@ class TokensAnalyzer:
         else:
             return
 
-        self.price_history[exchange][symbol].append({"price": price, "timestamp": int(time.time() * 1000)})
-
-        # Limit buffer size (keep data for last 24 hours)
-        max_size = 86400  # 24 hours in seconds
-        while len(self.price_history[exchange][symbol]) > max_size:
-            self.price_history[exchange][symbol].popleft()
-
-        # Add to volume history (use bid volume as proxy)
-        if isinstance(bid, list) and len(bid) >= 2:
-            volume = bid[1]
-        elif isinstance(ask, list) and len(ask) >= 2:
-            volume = ask[1]
-        else:
-            volume = 0
-
-        # Always add volume (even if 0)
-        self.volume_history[exchange][symbol].append({"volume": volume, "timestamp": int(time.time() * 1000)})
-
-        while len(self.volume_history[exchange][symbol]) > max_size:
-            self.volume_history[exchange][symbol].popleft()
-
-        # Add to trade history (each price update = trade)
-        self.trade_history[exchange][symbol].append({"count": 1, "timestamp": int(time.time() * 1000)})
+        # Volume (use bid volume as proxy)
+        volume = bid_size if bid_size is not None else ask_size
+
+        # Exchange timestamp when the record has one, so file replays keep their original times
+        ts = _tick_timestamp(entry.get("timestamp"), time.time_ns() // 1_000_000)
+
+        # Each price update counts as one trade; buffer keeps the last 86400 ticks
+        buffer_id = self._buffer_id(exchange, symbol)
+        self._buffers[buffer_id].append(ts, price, ask_price, bid_price, volume or 0)
+        self._dirty.add(buffer_id)
+
+    def _process_price_batch(self, entries: Iterable[Dict]):
+        """Ingest many price records at once: one pass to collect fields, NumPy for the rest."""
+        ids, stamps, quotes = [], [], []
+        now = time.time_ns() // 1_000_000
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            exchange = entry.get("exchange")
+            symbol = self._extract_symbol_from_data(entry)
+            if not exchange or not symbol:
+                continue
+            ask_price, ask_size = _unwrap_quote(entry.get("ask"))
+            bid_price, bid_size = _unwrap_quote(entry.get("bid"))
+            # Records without quotes (e.g. ExchangesWS error lines) carry no tick
+            if ask_price <= 0 and bid_price <= 0:
+                continue
+            ids.append(self._buffer_id(exchange, symbol))
+            stamps.append(_tick_timestamp(entry.get("timestamp"), now))
+            quotes.append((ask_price, bid_price, ask_size, bid_size))
+        if not ids:
+            return
 
-        while len(self.trade_history[exchange][symbol]) > max_size:
-            self.trade_history[exchange][symbol].popleft()
+        # Same rules as _process_price_data, over whole columns
+        ask, bid, ask_size, bid_size = np.array(quotes, dtype=np.float64).T  # None sizes become NaN
+        both = (ask > 0) & (bid > 0)
+        price = np.where(both, (ask + bid) / 2, np.where(ask > 0, ask, bid))
+        volume = np.nan_to_num(np.where(np.isnan(bid_size), ask_size, bid_size))
+
+        # Group ticks by buffer (stable sort keeps arrival order) and append each run in one go
+        ids = np.array(ids)
+        order = np.argsort(ids, kind="stable")
+        ts = np.array(stamps, dtype=np.int64)
+        columns = [column[order] for column in (ts, price, ask, bid, volume)]
+        buffer_ids, starts = np.unique(ids[order], return_index=True)
+        for buffer_id, start, end in zip(buffer_ids, starts, [*starts[1:], len(order)]):
+            self._buffers[buffer_id].extend(*(column[start:end] for column in columns))
+        self._dirty.update(buffer_ids.tolist())
+
+    def _get_cutoffs(self) -> np.ndarray:
+        """Window start timestamp of each metric, in METRIC_NAMES order."""
+        periods = [self.periods.get(name, "1h") for name in METRIC_NAMES]
+        cutoffs = {period: self._get_period_timestamp(period) for period in set(periods)}
+        return np.array([cutoffs[period] for period in periods], dtype=np.int64)
 
     def calculate_metrics(self, exchange: str, symbol: str) -> Dict:
         """Calculate all metrics for token on exchange."""
-
-        result = {}
-
-        # Get data for required periods
-        price_data = self._filter_by_period(self.price_history[exchange][symbol], self.periods.get("delta", "1h"))
-        volume_data = self._filter_by_period(self.volume_history[exchange][symbol], self.periods.get("vol", "1h"))
-        trade_data = self._filter_by_period(self.trade_history[exchange][symbol], self.periods.get("trade", "1h"))
-
-        # Calculate metrics
-        result["delta"] = self._calculate_delta(price_data)
-        result["vol"] = self._calculate_volume(volume_data)
-        result["trade"] = self._calculate_trade_count(trade_data)
-        result["NATR"] = self._calculate_natr(price_data)
-        result["spread"] = self._calculate_spread(price_data)
-        result["activity"] = self._calculate_activity(price_data)
-
-        return result
+        buffer = self._buffers[self._buffer_id(exchange, symbol)]
+        metrics = np.empty(len(METRIC_NAMES))
+        _buffer_metrics(buffer, self._get_cutoffs(), metrics, np.empty((2, len(METRIC_NAMES)), dtype=np.int64))
+        return _metrics_dict(metrics.tolist())
 
     def filter_and_save(self, output_path: Optional[str] = None) -> Dict:
         """
@@ -321,52 +519,61 @@ class TokensAnalyzer:
             output_path = self.output_path
 
         result: Dict[str, Any] = {}
+        rounded_result: Dict[str, Any] = {}
 
         # Process data from collection (only if not yet processed)
-        if self.last_prices_collection and not hasattr(self, "_data_processed"):
-            self.logger.info(f"Processing {len(self.last_prices_collection)} records from collection...")
-            for entry in self.last_prices_collection:
-                self._process_price_data(entry)
+        if self.last_prices_collection and not self._data_processed:
+            # run() continues from here with the real-time entries
+            self._last_processed_length = len(self.last_prices_collection)
+            self.logger.info(f"Processing {self._last_processed_length} records from collection...")
+            self._process_price_batch(self.last_prices_collection)
             self._data_processed = True
 
-        # Calculate metrics for all exchanges and tokens
-        for exchange in self.price_history:
-            result[exchange] = {}
-
-            for symbol in self.price_history[exchange]:
-                try:
-                    metrics = self.calculate_metrics(exchange, symbol)
-
-                    # Filter by thresholds (NATR can be 0, so check only if > 0)
-                    if (
-                        metrics["delta"] >= self.thresholds["delta"]
-                        and metrics["vol"] >= self.thresholds["vol"]
-                        and metrics["trade"] >= self.thresholds["trade"]
-                        and (metrics["NATR"] >= self.thresholds["NATR"] or metrics["NATR"] == 0)
-                        and metrics["spread"] >= self.thresholds["spread"]
-                        and metrics["activity"] >= self.thresholds["activity"]
-                    ):
-
-                        result[exchange][symbol] = metrics
-
-                except Exception as e:
-                    self.logger.error(f"Error calculating metrics for {exchange}:{symbol}: {traceback.format_exc(e)}")
-                    continue
-
-        # Round all numeric values to 4 decimal places
-        rounded_result = self._round_metrics(result)
+        # Metrics of all exchanges and tokens live in one (symbols, metrics) matrix. A row is
+        # recomputed only if its buffer got ticks or a cutoff moved past a tick of its window
+        cutoffs = self._get_cutoffs()
+        added = len(self._buffers) - len(self._metrics)
+        if added:
+            self._metrics = np.concatenate([self._metrics, np.zeros((added, len(METRIC_NAMES)))])
+            self._metric_bounds = np.concatenate([self._metric_bounds, np.full((added, 2, len(METRIC_NAMES)), _TS_MAX)])
+        lo, hi = self._metric_bounds[:, 0], self._metric_bounds[:, 1]
+        stale = ((cutoffs <= lo) | (cutoffs > hi)).any(axis=1)
+        stale[list(self._dirty)] = True
+        self._dirty.clear()
+        for i in np.flatnonzero(stale).tolist():
+            _buffer_metrics(self._buffers[i], cutoffs, self._metrics[i], self._metric_bounds[i])
+        metrics = self._metrics
+
+        # Filter by thresholds (NATR can be 0, so check only if > 0)
+        thresholds = np.array([self.thresholds[name] for name in METRIC_NAMES])
+        passed = metrics >= thresholds
+        passed[:, _NATR] |= metrics[:, _NATR] == 0
+        mask = passed.all(axis=1)
+        # Plain Python rows: dict building below works on floats, not NumPy scalars
+        rows, rounded_rows = metrics.tolist(), np.round(metrics, 4).tolist()
+
+        for exchange, _ in self._buffer_keys:
+            result.setdefault(exchange, {})
+            rounded_result.setdefault(exchange, {})
+        for i in np.flatnonzero(mask).tolist():
+            exchange, symbol = self._buffer_keys[i]
+            result[exchange][symbol] = _metrics_dict(rows[i])
+            rounded_result[exchange][symbol] = _metrics_dict(rounded_rows[i])
 
         # Save result only if save_to_file is True
         if self.save_to_file:
-            try:
-                with open(output_path, "w", encoding="utf-8") as f:
-                    json.dump(rounded_result, f, indent=2, ensure_ascii=False)
-                self.logger.info(f"Tokens analysis saved to {output_path}")
-            except Exception as e:
-                self.logger.error(f"Error saving tokens analysis: {e}")
+            payload = orjson.dumps(rounded_result, option=orjson.OPT_INDENT_2)
+            self._io_executor.submit(self._write_output, output_path, payload)
 
+        self._last_result, self._last_result_time = result, time.monotonic()
         return result
 
+    def latest_result(self, max_age: float) -> Dict:
+        """Last filter_and_save result if it is at most max_age seconds old, otherwise a fresh one."""
+        if self._last_result is None or time.monotonic() - self._last_result_time > max_age:
+            return self.filter_and_save()
+        return self._last_result
+
     async def run(self, interval: int = 60):
         """Run token analyzer in loop."""
         self.logger.info("Starting tokens analyzer...")
@@ -390,10 +597,15 @@ class TokensAnalyzer:
                     # If there are new records, process them
                     if hasattr(self, "_last_processed_length"):
                         if current_length > self._last_processed_length:
-                            new_entries = self.last_prices_collection[self._last_processed_length :]
-                            self.logger.info(f"Processing {len(new_entries)} new real-time entries...")
-                            for entry in new_entries:
-                                self._process_price_data(entry)
+                            self.logger.info(
+                                f"Processing {current_length - self._last_processed_length} new real-time entries..."
+                            )
+                            # Index the new tail directly instead of copying it out with a slice
+                            collection = self.last_prices_collection
+                            self._process_price_batch(
+                                collection[i] for i in range(self._last_processed_length, current_length)
+                            )
+                            self._last_processed_length = current_length
                     else:
                         # Set initial length after file processing
                         self._last_processed_length = current_length
@@ -419,8 +631,8 @@ class TokensAnalyzer:
             try:
                 await asyncio.sleep(10)  # Wait 10 seconds
 
-                # Get current data
-                result = self.filter_and_save()
+                # Get current data (reuse run()'s result if it is fresh enough)
+                result = self.latest_result(max_age=10)
 
                 if result:
                     total_tokens = sum(len(tokens) for tokens in result.values())
@@ -434,12 +646,8 @@ class TokensAnalyzer:
                             self.logger.info(f"  📈 {exchange.upper()}: {len(tokens)} tokens")
 
                             # Log top 3 tokens by delta for each exchange
-                            sorted_tokens = sorted(
-                                tokens.items(),
-                                key=lambda x: x[1].get("delta", 0),
-                                reverse=True,
-                            )
-                            for i, (symbol, metrics) in enumerate(sorted_tokens[:3]):
+                            top_tokens = heapq.nlargest(3, tokens.items(), key=lambda x: x[1].get("delta", 0))
+                            for i, (symbol, metrics) in enumerate(top_tokens):
                                 self.logger.info(
                                     f"    {i+1}. {symbol.upper()}: "
                                     f"Δ={metrics.get('delta', 0):.4f}, "
@@ -473,7 +681,7 @@ def filter_and_save(data, output_path="data/tokens_analyzer.json"):
                 fake_entry = {
                     "exchange": exchange,
                     "symbol": f"{coin.upper()}/USDT",
-                    "timestamp": int(time.time() * 1000),
+                    "timestamp": time.time_ns() // 1_000_000,
                     "ask": [100.0, 1.0],
                     "bid": [99.0, 1.0],
                 }
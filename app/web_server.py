@@ -1,11 +1,14 @@
 import asyncio
-import json
 import os
+import sys
+import time
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 import uvicorn
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, FastAPI, Request, Response
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
@@ -18,6 +21,31 @@ class FilterUpdate(BaseModel):
     thresholds: dict = {}
 
 
+class SymbolsUpdate(BaseModel):
+    symbols: List[dict] = []
+
+
+class ExchangesUpdate(BaseModel):
+    exchanges: List[dict] = []
+
+
+class OrdersUpdate(BaseModel):
+    orders: List[dict] = []
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that adds a Cache-Control header; ETag/304 handling is built into StaticFiles."""
+
+    def __init__(self, *args, cache_control: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = self.cache_control
+        return response
+
+
 class WebServer:
     """Async web server for system status monitoring."""
 
@@ -32,172 +60,240 @@ class WebServer:
         self.host = host
         self.port = port
         self.logger = get_logger()
-        self.app = FastAPI(title="Crypto Arbitrage Analyzer", version="1.0.0")
+        self.app = FastAPI(title="Crypto Arbitrage Analyzer", version="1.0.0", default_response_class=ORJSONResponse)
         self.templates = Jinja2Templates(directory="templates")
 
         # Mount static files from templates directory
-        self.app.mount("/templates", StaticFiles(directory="templates"), name="templates")
-
-        # Mount static files from utils directory to serve JSON files
-        self.app.mount("/utils", StaticFiles(directory="utils"), name="utils")
+        self.app.mount(
+            "/templates",
+            CachedStaticFiles(directory="templates", cache_control="public, max-age=30"),
+            name="templates",
+        )
+
+        # Mount static files from utils directory to serve JSON files (editable via the API, so always revalidate)
+        self.app.mount("/utils", CachedStaticFiles(directory="utils", cache_control="no-cache"), name="utils")
         self.last_prices_collection = last_prices_collection
         self.save_to_file = save_to_file
         self.tokens_analyzer = tokens_analyzer
 
+        # index.html rendered once with a "__TS__" timestamp placeholder
+        self._index_html: Optional[bytes] = None
+
+        # Formatted timestamp and the epoch second it was formatted for
+        self._timestamp_second = 0
+        self._timestamp_text = ""
+
+        # JSON files by path: (modification time, parsed data, raw bytes)
+        self._json_cache: Dict[str, Tuple[int, Any, bytes]] = {}
+        self._write_locks: Dict[str, asyncio.Lock] = {}
+
+        # Last /api/data payload and its serialized body, re-encoded only when the payload object changes
+        self._tokens_data: Optional[Dict] = None
+        self._tokens_body = b"{}"
+
         # Setup routes
         self._setup_routes()
 
     def _setup_routes(self):
         """Setup all web routes."""
+        router = APIRouter()
+        router.add_api_route("/", self.root, methods=["GET"], response_class=HTMLResponse)
+        router.add_api_route("/api/status", self.get_status, methods=["GET"])
+        router.add_api_route("/api/data", self.get_tokens_data, methods=["GET"])
+        router.add_api_route("/api/test", self.test_api, methods=["GET"])
+        router.add_api_route("/api/update-filters", self.update_filters, methods=["POST"])
+        router.add_api_route("/api/symbols", self.get_symbols, methods=["GET"])
+        router.add_api_route("/api/symbols", self.update_symbols, methods=["POST"])
+        router.add_api_route("/api/exchanges", self.get_exchanges, methods=["GET"])
+        router.add_api_route("/api/exchanges", self.update_exchanges, methods=["POST"])
+        router.add_api_route("/api/orders", self.get_orders, methods=["GET"])
+        router.add_api_route("/api/orders", self.update_orders, methods=["POST"])
+        self.app.include_router(router)
+
+    async def root(self, request: Request):
+        """Main page with system status."""
+        return await self._render_main_page(request)
+
+    async def get_status(self):
+        """API endpoint to get system status."""
+        return {
+            "status": "running",
+            "timestamp": self._timestamp(),
+            "message": "Token analyzer is running and logging data every 10 seconds",
+        }
+
+    async def get_tokens_data(self):
+        """API endpoint to get tokens analyzer data."""
+        data = await self._load_tokens_data()
+        if data is not self._tokens_data:
+            self._tokens_data, self._tokens_body = data, orjson.dumps(data)
+        return Response(self._tokens_body, media_type="application/json")
+
+    async def test_api(self):
+        """Test API endpoint."""
+        return {"status": "success", "message": "API is working"}
+
+    async def update_filters(self, request: FilterUpdate):
+        """API endpoint to update token analyzer filters."""
+        try:
+            periods = request.periods
+            thresholds = request.thresholds
 
-        @self.app.get("/", response_class=HTMLResponse)
-        async def root(request: Request):
-            """Main page with system status."""
-            return await self._render_main_page(request)
-
-        @self.app.get("/api/status")
-        async def get_status():
-            """API endpoint to get system status."""
-            return {
-                "status": "running",
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "message": "Token analyzer is running and logging data every 10 seconds",
-            }
-
-        @self.app.get("/api/data")
-        async def get_tokens_data():
-            """API endpoint to get tokens analyzer data."""
-            return await self._load_tokens_data()
-
-        @self.app.get("/api/test")
-        async def test_api():
-            """Test API endpoint."""
-            return {"status": "success", "message": "API is working"}
-
-        @self.app.post("/api/update-filters")
-        async def update_filters(request: FilterUpdate):
-            """API endpoint to update token analyzer filters."""
-            try:
-                periods = request.periods
-                thresholds = request.thresholds
-
-                if self.tokens_analyzer:
-                    # Update periods
-                    if periods:
-                        self.tokens_analyzer.periods.update(periods)
-                        self.logger.info(f"📊 FILTER UPDATE - Periods: {periods}")
-
-                    # Update thresholds
-                    if thresholds:
-                        self.tokens_analyzer.thresholds.update(thresholds)
-                        self.logger.info(f"📊 FILTER UPDATE - Thresholds: {thresholds}")
-
-                    return {
-                        "status": "success",
-                        "message": "Filters updated successfully",
-                    }
-                else:
-                    return {
-                        "status": "error",
-                        "message": "Token analyzer not available",
-                    }
-
-            except Exception as e:
-                self.logger.error(f"Error updating filters: {e}")
-                return {"status": "error", "message": str(e)}
-
-        @self.app.get("/api/symbols")
-        async def get_symbols():
-            """API endpoint to get symbols from symbols.json."""
-            try:
-                symbols_path = "utils/symbols.json"
-                if os.path.exists(symbols_path):
-                    with open(symbols_path, encoding="utf-8") as f:
-                        symbols = json.load(f)
-                        return {"status": "success", "data": symbols}
-                else:
-                    return {"status": "error", "message": "Symbols file not found"}
-            except Exception as e:
-                self.logger.error(f"Error loading symbols: {e}")
-                return {"status": "error", "message": str(e)}
-
-        @self.app.post("/api/symbols")
-        async def update_symbols(request: dict):
-            """API endpoint to update symbols in symbols.json."""
+            if self.tokens_analyzer:
+                # Update periods
+                if periods:
+                    self.tokens_analyzer.periods.update(periods)
+                    self.logger.info(f"📊 FILTER UPDATE - Periods: {periods}")
+
+                # Update thresholds
+                if thresholds:
+                    self.tokens_analyzer.thresholds.update(thresholds)
+                    self.logger.info(f"📊 FILTER UPDATE - Thresholds: {thresholds}")
+
+                return {
+                    "status": "success",
+                    "message": "Filters updated successfully",
+                }
+            else:
+                return {
+                    "status": "error",
+                    "message": "Token analyzer not available",
+                }
+
+        except Exception as e:
+            self.logger.error(f"Error updating filters: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def get_symbols(self):
+        """API endpoint to get symbols from symbols.json."""
+        try:
+            symbols_path = "utils/symbols.json"
             try:
-                symbols_path = "utils/symbols.json"
-                symbols = request.get("symbols", [])
+                symbols = await asyncio.to_thread(self._read_json_bytes, symbols_path)
+            except FileNotFoundError:
+                return {"status": "error", "message": "Symbols file not found"}
+            return self._success_response(symbols)
+        except Exception as e:
+            self.logger.error(f"Error loading symbols: {e}")
+            return {"status": "error", "message": str(e)}
 
-                with open(symbols_path, "w", encoding="utf-8") as f:
-                    json.dump(symbols, f, indent=2, ensure_ascii=False)
+    async def update_symbols(self, request: SymbolsUpdate):
+        """API endpoint to update symbols in symbols.json."""
+        try:
+            symbols_path = "utils/symbols.json"
+            symbols = request.symbols
 
-                self.logger.info(f"📊 SYMBOLS UPDATE - Updated {len(symbols)} symbols")
-                return {"status": "success", "message": "Symbols updated successfully"}
-            except Exception as e:
-                self.logger.error(f"Error updating symbols: {e}")
-                return {"status": "error", "message": str(e)}
+            await self._save_json(symbols_path, symbols)
 
-        @self.app.get("/api/exchanges")
-        async def get_exchanges():
-            """API endpoint to get exchanges from exchange.json."""
-            try:
-                exchanges_path = "utils/exchange.json"
-                if os.path.exists(exchanges_path):
-                    with open(exchanges_path, encoding="utf-8") as f:
-                        exchanges = json.load(f)
-                        return {"status": "success", "data": exchanges}
-                else:
-                    return {"status": "error", "message": "Exchanges file not found"}
-            except Exception as e:
-                self.logger.error(f"Error loading exchanges: {e}")
-                return {"status": "error", "message": str(e)}
-
-        @self.app.post("/api/exchanges")
-        async def update_exchanges(request: dict):
-            """API endpoint to update exchanges in exchange.json."""
+            self.logger.info(f"📊 SYMBOLS UPDATE - Updated {len(symbols)} symbols")
+            return {"status": "success", "message": "Symbols updated successfully"}
+        except Exception as e:
+            self.logger.error(f"Error updating symbols: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def get_exchanges(self):
+        """API endpoint to get exchanges from exchange.json."""
+        try:
+            exchanges_path = "utils/exchange.json"
             try:
-                exchanges_path = "utils/exchange.json"
-                exchanges = request.get("exchanges", [])
+                exchanges = await asyncio.to_thread(self._read_json_bytes, exchanges_path)
+            except FileNotFoundError:
+                return {"status": "error", "message": "Exchanges file not found"}
+            return self._success_response(exchanges)
+        except Exception as e:
+            self.logger.error(f"Error loading exchanges: {e}")
+            return {"status": "error", "message": str(e)}
 
-                with open(exchanges_path, "w", encoding="utf-8") as f:
-                    json.dump(exchanges, f, indent=2, ensure_ascii=False)
+    async def update_exchanges(self, request: ExchangesUpdate):
+        """API endpoint to update exchanges in exchange.json."""
+        try:
+            exchanges_path = "utils/exchange.json"
+            exchanges = request.exchanges
 
-                self.logger.info(f"📊 EXCHANGES UPDATE - Updated {len(exchanges)} exchanges")
-                return {"status": "success", "message": "Exchanges updated successfully"}
-            except Exception as e:
-                self.logger.error(f"Error updating exchanges: {e}")
-                return {"status": "error", "message": str(e)}
+            await self._save_json(exchanges_path, exchanges)
 
-        @self.app.get("/api/orders")
-        async def get_orders():
-            """API endpoint to get orders from orders.json."""
-            try:
-                orders_path = "utils/orders.json"
-                if os.path.exists(orders_path):
-                    with open(orders_path, encoding="utf-8") as f:
-                        orders = json.load(f)
-                        return {"status": "success", "data": orders}
-                else:
-                    return {"status": "error", "message": "Orders file not found"}
-            except Exception as e:
-                self.logger.error(f"Error loading orders: {e}")
-                return {"status": "error", "message": str(e)}
-
-        @self.app.post("/api/orders")
-        async def update_orders(request: dict):
-            """API endpoint to update orders in orders.json."""
+            self.logger.info(f"📊 EXCHANGES UPDATE - Updated {len(exchanges)} exchanges")
+            return {"status": "success", "message": "Exchanges updated successfully"}
+        except Exception as e:
+            self.logger.error(f"Error updating exchanges: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def get_orders(self):
+        """API endpoint to get orders from orders.json."""
+        try:
+            orders_path = "utils/orders.json"
             try:
-                orders_path = "utils/orders.json"
-                orders = request.get("orders", [])
+                orders = await asyncio.to_thread(self._read_json_bytes, orders_path)
+            except FileNotFoundError:
+                return {"status": "error", "message": "Orders file not found"}
+            return self._success_response(orders)
+        except Exception as e:
+            self.logger.error(f"Error loading orders: {e}")
+            return {"status": "error", "message": str(e)}
 
-                with open(orders_path, "w", encoding="utf-8") as f:
-                    json.dump(orders, f, indent=2, ensure_ascii=False)
+    async def update_orders(self, request: OrdersUpdate):
+        """API endpoint to update orders in orders.json."""
+        try:
+            orders_path = "utils/orders.json"
+            orders = request.orders
+
+            await self._save_json(orders_path, orders)
 
-                self.logger.info(f"📊 ORDERS UPDATE - Updated {len(orders)} orders")
-                return {"status": "success", "message": "Orders updated successfully"}
-            except Exception as e:
-                self.logger.error(f"Error updating orders: {e}")
-                return {"status": "error", "message": str(e)}
+            self.logger.info(f"📊 ORDERS UPDATE - Updated {len(orders)} orders")
+            return {"status": "success", "message": "Orders updated successfully"}
+        except Exception as e:
+            self.logger.error(f"Error updating orders: {e}")
+            return {"status": "error", "message": str(e)}
+
+    def _timestamp(self) -> str:
+        """Current local time as text, formatted at most once per second."""
+        second = int(time.time())
+        if second != self._timestamp_second:
+            self._timestamp_second = second
+            self._timestamp_text = datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+        return self._timestamp_text
+
+    def _read_json_entry(self, path: str) -> Tuple[int, Any, bytes]:
+        """(mtime, parsed data, raw bytes) of a JSON file, re-read only when its modification time changes."""
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._json_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "rb") as f:
+                raw = f.read()
+            cached = self._json_cache[path] = (mtime, orjson.loads(raw), raw)
+        return cached
+
+    def _read_json_cached(self, path: str) -> Any:
+        """Parsed JSON file from the cache."""
+        return self._read_json_entry(path)[1]
+
+    def _read_json_bytes(self, path: str) -> bytes:
+        """Raw JSON file bytes from the cache."""
+        return self._read_json_entry(path)[2]
+
+    @staticmethod
+    def _success_response(data: bytes) -> Response:
+        """{"status": "success", "data": ...} response around already serialized JSON."""
+        return Response(b'{"status":"success","data":' + data + b"}", media_type="application/json")
+
+    async def _save_json(self, path: str, data: Any):
+        """Write a JSON file in a worker thread, one writer per file at a time."""
+        async with self._write_locks.setdefault(path, asyncio.Lock()):
+            await asyncio.to_thread(self._write_json, path, data)
+
+    def _write_json(self, path: str, data: Any):
+        """Atomically replace a JSON file and refresh its cache entry, skipping unchanged data."""
+        try:
+            if self._read_json_cached(path) == data:
+                return
+        except (OSError, ValueError):
+            pass
+        tmp_path = path + ".tmp"
+        raw = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+        self._json_cache[path] = (os.stat(path).st_mtime_ns, data, raw)
 
     async def _load_tokens_data(self):
         """Load tokens analyzer data from analyzer or file."""
@@ -205,7 +301,7 @@ class WebServer:
             # First try to get data from tokens analyzer if available
             if self.tokens_analyzer:
                 try:
-                    result = self.tokens_analyzer.filter_and_save()
+                    result = self.tokens_analyzer.latest_result(max_age=5)
                     if result and len(result) > 0:
                         self.logger.info(f"Loaded real-time tokens data from analyzer with {len(result)} exchanges")
                         return result
@@ -216,14 +312,16 @@ class WebServer:
 
             # Fallback to JSON file if available
             data_path = "data/tokens_analyzer.json"
-            if os.path.exists(data_path):
-                with open(data_path, encoding="utf-8") as f:
-                    data = json.load(f)
-                    if data and len(data) > 0:
-                        self.logger.info(f"Loaded tokens data from file with {len(data)} exchanges")
-                        return data
-                    else:
-                        self.logger.warning("Tokens data file is empty")
+            try:
+                data = await asyncio.to_thread(self._read_json_cached, data_path)
+            except FileNotFoundError:
+                pass
+            else:
+                if data and len(data) > 0:
+                    self.logger.info(f"Loaded tokens data from file with {len(data)} exchanges")
+                    return data
+                else:
+                    self.logger.warning("Tokens data file is empty")
 
             self.logger.warning("No tokens data available")
             return {}
@@ -235,15 +333,11 @@ class WebServer:
     async def _render_main_page(self, request: Request) -> HTMLResponse:
         """Render the main page with status information."""
         try:
-            context = {
-                "request": request,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            }
-            response = self.templates.TemplateResponse("index.html", context)
-            return HTMLResponse(
-                content=(response.body.decode("utf-8") if isinstance(response.body, bytes) else response.body),
-                status_code=200,
-            )
+            if self._index_html is None:
+                template = self.templates.get_template("index.html")
+                self._index_html = template.render(request=request, timestamp="__TS__").encode("utf-8")
+            timestamp = self._timestamp().encode("utf-8")
+            return HTMLResponse(content=self._index_html.replace(b"__TS__", timestamp), status_code=200)
 
         except Exception as e:
             self.logger.error(f"Error rendering main page: {e}")
@@ -279,9 +373,21 @@ class WebServer:
 
     def run(self):
         """Run the web server (blocking)."""
+        use_uvloop()
         asyncio.run(self.start())
 
 
+def use_uvloop():
+    """Run new event loops on uvloop when it is installed (uvicorn[standard]; never on Windows)."""
+    if sys.platform == "win32":
+        return
+    try:
+        import uvloop
+    except ImportError:  # e.g. plain uvicorn or PyPy: keep the default asyncio loop
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
 # Create templates directory
 def create_templates():
     """Create templates directory."""
@@ -1,5 +1,3 @@
-import asyncio
-import threading
 import tkinter as tk
 import webbrowser
 from tkinter import ttk
@@ -18,6 +16,8 @@ class DesktopApp:
         self.progress.pack(side=tk.BOTTOM, fill=tk.X)
         self.status = ttk.Label(self.root, text="Ініціалізація...")
         self.status.pack(side=tk.BOTTOM, fill=tk.X)
+        self._pending_status = ""
+        self._status_scheduled = False
 
         self.frame = ttk.Frame(self.root)
         self.frame.pack(fill="both", expand=True)
@@ -28,24 +28,33 @@ class DesktopApp:
 
         self.start_async_loading()
 
-    async def load_chart(self):
-        """Асинхронне завантаження графіка"""
-        self.update_status("Підготовка інтерфейсу...")
-        await asyncio.sleep(0.5)
-
+    def _load_tradingview(self):
+        """Другий етап завантаження графіка"""
         self.update_status("Завантаження TradingView...")
-        await asyncio.sleep(0.5)
-
-        # Створюємо браузер в головному потоці
-        self.root.after(0, self.create_browser_ui)
+        self.root.after(500, self._show_chart)
 
+    def _show_chart(self):
+        """Створення браузера і завершення завантаження"""
+        self.create_browser_ui()
         self.update_status("Графік готовий!")
-        await asyncio.sleep(1)
+        self.root.after(1000, self._finish_loading)
+
+    def _finish_loading(self):
+        """Завершення завантаження"""
         self.update_status("")
+        self.progress.stop()
 
     def update_status(self, text):
-        """Оновлення статусу з головного потоку"""
-        self.root.after(0, lambda: self.status.config(text=text))
+        """Оновлення статусу з головного потоку (не частіше ніж раз на кадр)"""
+        self._pending_status = text
+        if not self._status_scheduled:
+            self._status_scheduled = True
+            self.root.after(16, self._flush_status)
+
+    def _flush_status(self):
+        """Показ останнього запланованого статусу"""
+        self._status_scheduled = False
+        self.status.config(text=self._pending_status)
 
     def open_in_browser(self):
         """Відкрити TradingView в браузері"""
@@ -99,18 +108,10 @@ class DesktopApp:
             self.status.config(text=f"Помилка перевірки iframe: {e}")
 
     def start_async_loading(self):
-        """Запуск асинхронного завантаження"""
+        """Запуск поетапного завантаження на таймерах Tk"""
         self.progress.start()
-
-        async def run():
-            await self.load_chart()
-            self.root.after(0, self.progress.stop)
-
-        def run_async():
-            asyncio.run(run())
-
-        thread = threading.Thread(target=run_async, daemon=True)
-        thread.start()
+        self.update_status("Підготовка інтерфейсу...")
+        self.root.after(500, self._load_tradingview)
 
     def run(self):
         self.root.mainloop()
@@ -1,13 +1,19 @@
 import os
+import queue
 import threading
 import time
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-import pyautogui
+import mss
 import pygetwindow as gw
 from PIL import Image, ImageTk
 
+try:
+    import dxcam
+except ImportError:  # DXcam є лише для Windows: захоплення через mss
+    dxcam = None
+
 
 class WindowCapturer:
     """Клас для захоплення вигляду вікон програм та їх відтворення у tkinter"""
@@ -22,8 +28,23 @@ class WindowCapturer:
         self.windows_list = []
         self.selected_window = None
         self.captured_image = None
+        self.screenshot = None
+        self._canvas_item = None
+        self._canvas_size = (1, 1)
+        self._frames = queue.Queue(maxsize=1)
         self.auto_refresh = False
 
+        # Екземпляр mss для захоплень у головному (Tk) потоці: mss тримає ресурси ОС (на Windows — GDI-контексти)
+        # у потоці, що його створив, тому інші потоки мають створювати власний екземпляр
+        self._sct = mss.mss()
+        # DXcam (Desktop Duplication API) лише на Windows, якщо встановлено
+        self._cam = None
+        if dxcam is not None:
+            try:
+                self._cam = dxcam.create(output_color="RGB")
+            except Exception:  # Desktop Duplication недоступний (RDP, headless GPU): захоплення через mss
+                self._cam = None
+
         self.create_gui()
         self.load_windows_list()
 
@@ -96,6 +117,8 @@ class WindowCapturer:
         # Полотно для зображення
         self.canvas = tk.Canvas(display_frame, bg="#1e1e1e", highlightthickness=1, highlightbackground="#4e4e4e")
         self.canvas.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Розмір полотна для робочого потоку автооновлення, який не може викликати winfo_*
+        self.canvas.bind("<Configure>", lambda e: setattr(self, "_canvas_size", (e.width, e.height)))
 
         # Статус бар
         self.status_var = tk.StringVar(value="Готовий до роботи")
@@ -137,30 +160,66 @@ class WindowCapturer:
             self.status_var.set(f"Захоплюю вигляд вікна: {self.selected_window.title}")
 
             # Захоплюємо скріншот вікна
-            screenshot = pyautogui.screenshot(
-                region=(
-                    self.selected_window.left,
-                    self.selected_window.top,
-                    self.selected_window.width,
-                    self.selected_window.height,
-                )
-            )
-
-            # Конвертуємо для tkinter
-            self.captured_image = ImageTk.PhotoImage(screenshot)
-
-            # Відображаємо на полотні
-            self.canvas.delete("all")
-            self.canvas.create_image(0, 0, anchor=tk.NW, image=self.captured_image)
+            self._apply_pil(*self._grab_pil(self.selected_window, self._sct))
+
+        except Exception as e:
+            self.status_var.set(f"Помилка захоплення: {str(e)}")
+            messagebox.showerror("Помилка", f"Не вдалося захопити вікно:\n{str(e)}")
+
+    def _grab_pil(self, window, sct):
+        """Знімок вікна і його копія під розмір полотна, без звернень до Tk (sct — mss цього ж потоку)"""
+        screenshot = self._grab_screenshot(window, sct)
+        return window, screenshot, self._fit_to_canvas(screenshot)
+
+    def _apply_pil(self, window, screenshot, display):
+        """Відображення знімка на полотні (лише з головного потоку)"""
+        self.screenshot = screenshot
+
+        # Той самий розмір: копіюємо пікселі в наявний PhotoImage, елемент полотна не змінюється
+        image = self.captured_image
+        if image is not None and (image.width(), image.height()) == display.size:
+            image.paste(display)
+        else:
+            # Конвертуємо для tkinter і відображаємо на полотні
+            self.captured_image = ImageTk.PhotoImage(display)
+            if self._canvas_item is None:
+                self._canvas_item = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.captured_image)
+            else:
+                self.canvas.itemconfig(self._canvas_item, image=self.captured_image)
 
             # Налаштовуємо скроллбари якщо потрібно
             self.canvas.config(scrollregion=self.canvas.bbox(tk.ALL))
 
-            self.status_var.set(f"Захоплено: {self.selected_window.title} ({screenshot.size})")
+        self.status_var.set(f"Захоплено: {window.title} ({screenshot.size})")
 
-        except Exception as e:
-            self.status_var.set(f"Помилка захоплення: {str(e)}")
-            messagebox.showerror("Помилка", f"Не вдалося захопити вікно:\n{str(e)}")
+    def _apply_latest_frame(self):
+        """Показ останнього кадру з черги автооновлення"""
+        try:
+            frame = self._frames.get_nowait()
+        except queue.Empty:
+            return
+        self._apply_pil(*frame)
+
+    def _fit_to_canvas(self, screenshot):
+        """Зменшення знімка до розміру полотна, якщо він більший у 1.5+ рази (Tk не отримує зайвих пікселів)"""
+        width, height = self._canvas_size
+        if width <= 1 or height <= 1 or (screenshot.width <= 1.5 * width and screenshot.height <= 1.5 * height):
+            return screenshot
+        scale = min(width / screenshot.width, height / screenshot.height)
+        size = (max(1, int(screenshot.width * scale)), max(1, int(screenshot.height * scale)))
+        return screenshot.resize(size, Image.BILINEAR)
+
+    def _grab_screenshot(self, window, sct):
+        """Знімок області вікна: DXcam, якщо вікно на основному моніторі Windows, інакше mss (sct цього ж потоку)"""
+        left, top, width, height = window.left, window.top, window.width, window.height
+        cam = self._cam
+        if cam is not None and left >= 0 and top >= 0 and left + width <= cam.width and top + height <= cam.height:
+            # None означає, що кадр не змінився з попереднього знімка DXcam
+            frame = cam.grab(region=(left, top, left + width, top + height))
+            if frame is not None:
+                return Image.fromarray(frame)
+        raw = sct.grab({"left": left, "top": top, "width": width, "height": height})
+        return Image.frombytes("RGB", raw.size, raw.bgra, "raw", "BGRX")
 
     def show_in_tkinter(self):
         """Відображення захопленого вигляду у новому вікні tkinter"""
@@ -177,8 +236,9 @@ class WindowCapturer:
         canvas = tk.Canvas(preview_window, bg="#1e1e1e")
         canvas.pack(fill=tk.BOTH, expand=True)
 
-        # Відображаємо зображення
-        canvas.create_image(0, 0, anchor=tk.NW, image=self.captured_image)
+        # Відображаємо зображення у повній роздільності (на головному полотні воно може бути зменшене)
+        canvas.image = ImageTk.PhotoImage(self.screenshot)
+        canvas.create_image(0, 0, anchor=tk.NW, image=canvas.image)
 
         # Додаємо скроллбари для великих зображень
         h_scrollbar = tk.Scrollbar(preview_window, orient=tk.HORIZONTAL, command=canvas.xview)
@@ -212,14 +272,31 @@ class WindowCapturer:
 
     def _auto_refresh_worker(self):
         """Робочий потік для автоматичного оновлення"""
-        while self.auto_refresh:
-            try:
-                if self.selected_window and not self.selected_window.isMinimized:
-                    self.capture_window()
-                time.sleep(2)  # Оновлення кожні 2 секунди
-            except Exception as e:
-                print(f"Помилка автооновлення: {e}")
-                time.sleep(1)
+        try:
+            # Власний екземпляр mss: ресурси ОС екземпляра головного потоку тут недійсні
+            with mss.mss() as sct:
+                while self.auto_refresh:
+                    window = self.selected_window
+                    if window and not window.isMinimized:
+                        frame = self._grab_pil(window, sct)
+                        # Черга на один кадр: непоказаний старий кадр замінюється новим, потік не чекає на Tk
+                        try:
+                            self._frames.get_nowait()
+                        except queue.Empty:
+                            pass
+                        self._frames.put_nowait(frame)
+                        self.root.after(0, self._apply_latest_frame)
+                    time.sleep(2)  # Оновлення кожні 2 секунди
+        except Exception as e:
+            # Помилка повторилася б на кожному кадрі: зупиняємо автооновлення і показуємо її в головному потоці
+            self.auto_refresh = False
+            self.root.after(0, self._auto_refresh_failed, e)
+
+    def _auto_refresh_failed(self, error):
+        """Зупинка автооновлення після помилки захоплення"""
+        self.auto_refresh_var.set(False)
+        self.status_var.set(f"Помилка автооновлення: {error}")
+        messagebox.showerror("Помилка", f"Автооновлення зупинено:\n{error}")
 
 
 def create_window_capturer():
@@ -4,7 +4,7 @@ import traceback
 from app.arbitrage_analyzer import AnalyzeArbitrage
 from app.exchanges_ws import ExchangesWS
 from app.token_analyzer import TokensAnalyzer
-from app.web_server import WebServer
+from app.web_server import WebServer, use_uvloop
 from desktop.main import DesktopApp
 from utils.logger import get_logger
 from utils.settings import get_settings
@@ -75,4 +75,5 @@ async def main():
 
 if __name__ == "__main__":
     # Run main with web server options
+    use_uvloop()
     asyncio.run(main())
@@ -19,9 +19,11 @@ class MultiLogger:
         loguru_logger.remove()
 
         # Додаємо обробник для stderr (консоль)
+        # enqueue=True: запис виконує фоновий потік, виклик логера лише ставить запис у чергу
         loguru_logger.add(
             stderr,
             format="<white>{time:HH:mm:ss}</white> | <level>{level: <8}</level> | [<cyan>{file.name}:{line}</cyan>] - <white>{message}</white>",
+            enqueue=True,
         )
 
         # Додаємо обробник для дефолтного файлу (log.log)
@@ -30,6 +32,7 @@ class MultiLogger:
             format="<white>{time:HH:mm:ss}</white> | <level>{level: <8}</level> | [<cyan>{file.name}:{line}</cyan>] - <white>{message}</white>",
             # Фільтр: записуємо лише повідомлення без project_name (тобто ті, що йдуть через multi_logger.info() тощо)
             filter=lambda record: "project_name" not in record["extra"],
+            enqueue=True,
         )
 
     def _get_logger(self, name):
@@ -46,6 +49,7 @@ class MultiLogger:
             format="<white>{time:HH:mm:ss}</white> | <level>{level: <8}</level> | [<cyan>{file.name}:{line}</cyan>] - <white>{message}</white>",
             # Фільтр: записуємо лише повідомлення, де project_name == name
             filter=lambda record: record["extra"].get("project_name") == name,
+            enqueue=True,
         )
 
         self.loggers[name] = new_logger
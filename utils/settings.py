@@ -203,6 +203,13 @@ class Settings:
         result = self.get("tokens_analyzer.periods", default_periods)
         return result if isinstance(result, dict) else default_periods
 
+    @property
+    def tokens_periods_seconds(self) -> Dict[str, int]:
+        """Get tokens analyzer period length in seconds by period name."""
+        default_seconds = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "4h": 14400, "1d": 86400}
+        result = self.get("tokens_analyzer.periods_seconds", default_seconds)
+        return result if isinstance(result, dict) else default_seconds
+
     @property
     def tokens_thresholds(self) -> Dict[str, float]:
         """Get tokens analyzer thresholds configuration."""